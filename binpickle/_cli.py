@@ -2,24 +2,70 @@
 """
 BinPickle CLI internals.
 """
+
 import argparse
 import io
 import logging
 import pickletools
 import sys
 from textwrap import dedent
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence
 
 import prettytable as pt
-
-from binpickle.errors import IntegrityError
+from typing_extensions import Buffer
 
 from . import BinPickleFile
-from .format import pretty_codec
+from .format import CodecSpec, pretty_codec
 
 _log = logging.getLogger(__name__)
 
 
+class _BufferReader(io.RawIOBase):
+    """
+    Read-only file over an in-memory buffer.  Unlike :class:`io.BytesIO`, this
+    does not copy the buffer.
+    """
+
+    def __init__(self, buf: Buffer):
+        self._mv = memoryview(buf).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += len(self._mv)
+        self._pos = max(pos, 0)
+        return self._pos
+
+    def readinto(self, b: Buffer):
+        out = memoryview(b).cast("B")
+        n = max(min(len(out), len(self._mv) - self._pos), 0)
+        out[:n] = self._mv[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._mv.release()
+        super().close()
+
+
+def _positive_int(arg: str) -> int:
+    n = int(arg)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
 def parse_cli(args: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         "binpickle",
@@ -39,6 +85,13 @@ Print information from a binpickle file.
         "-D", "--disassemble", action="store_true", help="disassemble the pickle data"
     )
     dump.add_argument("-V", "--verify", action="store_true", help="verify buffer checksums")
+    dump.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        metavar="N",
+        help="use up to N threads to verify buffers (with -V)",
+    )
 
     return parser.parse_args(args)
 
@@ -50,6 +103,19 @@ def init_cli(opts: argparse.Namespace, init_log: bool):
         logging.basicConfig(stream=sys.stderr, level=level)
 
 
+def _pretty_codec_cached(codecs: list[CodecSpec], cache: dict[Any, str]) -> str:
+    "Format a codec list, re-using the result for repeated lists (common in one file)."
+    try:
+        key = tuple(frozenset(c.items()) for c in codecs)
+        pc = cache.get(key)
+    except TypeError:
+        # unhashable configuration
+        return pretty_codec(codecs)
+    if pc is None:
+        pc = cache[key] = pretty_codec(codecs)
+    return pc
+
+
 def list_buffers(bpf: BinPickleFile, opts: argparse.Namespace):
     table = pt.PrettyTable()
     table.field_names = ["#", "Offset", "Length", "Enc. Len.", "Type", "Shape", "Codec"]
@@ -58,46 +124,54 @@ def list_buffers(bpf: BinPickleFile, opts: argparse.Namespace):
     table.align["Shape"] = "c"  # pyright: ignore
     table.align["Codec"] = "c"  # pyright: ignore
     table.vrules = pt.NONE
+
+    codec_names: dict[Any, str] = {}
+    shape_strs: dict[tuple[int, ...], str] = {}
+    rows = []
     for i, entry in enumerate(bpf.entries):
         row = [i, entry.offset, entry.dec_length, entry.enc_length]
         if entry.info is None:
             row += ["", ""]
         else:
             at, dt, shape = entry.info
-            ss = ", ".join(str(i) for i in shape)
+            shape = tuple(shape)
+            ss = shape_strs.get(shape)
+            if ss is None:
+                ss = shape_strs[shape] = ", ".join(map(str, shape))
             if at != "ndarray":
                 dt = f"{at}[{dt}]"
             row += [dt, ss]
 
-        row.append(pretty_codec(entry.codecs))
-        table.add_row(row)
+        row.append(_pretty_codec_cached(entry.codecs, codec_names))
+        rows.append(row)
 
+    table.add_rows(rows)
     print(table)
 
 
 def disassemble_pickle(bpf: BinPickleFile, opts: argparse.Namespace):
-    buf = bpf._read_buffer(bpf.entries[-1])
-    pickletools.dis(io.BytesIO(buf), sys.stdout)
+    # read in direct mode and wrap without copying; only compressed pickles get decoded
+    buf = bpf._read_buffer(bpf.entries[-1], direct=True)
+    with _BufferReader(buf) as pf:
+        pickletools.dis(pf, sys.stdout)
+    del buf
 
 
 def verify_buffers(bpf: BinPickleFile, opts: argparse.Namespace):
     nbad = 0
 
-    for i, entry in enumerate(bpf.entries):
-        assert bpf._mv is not None
-        start = entry.offset
-        end = start + entry.enc_length
-        buf = bpf._mv[start:end]
-        try:
-            _log.debug("buffer %d: verifying %d bytes", i, entry.enc_length)
-            _log.debug("buffer %d: hash %s", i, entry.hash.hex())
-            bpf._verify_buffer(buf, entry.hash, force=True)
+    # we read every byte once, so let the kernel read ahead aggressively
+    bpf._advise("MADV_SEQUENTIAL")
+    bpf._advise("MADV_WILLNEED")
+
+    hashes = bpf._entry_hashes(bpf.entries, opts.jobs)
+    for i, (entry, hash) in enumerate(zip(bpf.entries, hashes)):
+        _log.debug("buffer %d: hash %s", i, entry.hash.hex())
+        if hash == entry.hash:
             _log.info("buffer %d (%d bytes) verified", i, entry.enc_length)
-        except IntegrityError as e:
-            _log.error("buffer %d invalid: %s", i, e)
+        else:
+            _log.error("buffer %d invalid: incorrect hash %s", i, hash.hex())
             nbad += 1
-        finally:
-            buf.release()
 
     return nbad > 0
 
@@ -7,13 +7,29 @@
 """
 Internal utility functions for Binpickle.
 """
+
 from __future__ import annotations
 
 import hashlib
-from typing import Any, Optional
+import os
+from typing import Any, BinaryIO, Optional, Sequence, TypeVar
 
 from typing_extensions import Buffer
 
+WRITE_CHUNK_SIZE = 1024 * 1024
+"""
+Chunk size for :func:`write_hashed`, small enough for each chunk to still be in
+cache when it is written after hashing.
+"""
+
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+"""
+Minimum amount of data per worker thread for hashing or coding buffers in
+parallel, so the work outweighs the cost of the thread pool.
+"""
+
+T = TypeVar("T")
+
 naturalsize: Optional[Any]
 
 try:
@@ -26,11 +42,84 @@ def human_size(bytes: int | float) -> str:
     if naturalsize:
         return naturalsize(bytes, binary=True, format="%.2f")
     else:
-        return "{:.2f} MiB".format(bytes / (1024 * 1024))
+        # integer arithmetic in hundredths of a MiB, rounding half to even like "%.2f"
+        hundredths, rem = divmod(int(bytes) * 100, 1 << 20)
+        if rem > 1 << 19 or (rem == 1 << 19 and hundredths % 2):
+            hundredths += 1
+        mib, frac = divmod(hundredths, 100)
+        return f"{mib}.{frac:02d} MiB"
+
+
+def buffer_size(buf: Buffer) -> int:
+    """
+    Get the size of a buffer in bytes, without creating a memoryview for
+    common buffer types.  Note that ``len`` is not enough for memoryviews or
+    arrays, as it counts elements instead of bytes.
+    """
+    if isinstance(buf, (bytes, bytearray)):
+        return len(buf)
+    nbytes = getattr(buf, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return memoryview(buf).nbytes
 
 
 def hash_buffer(buf: Buffer) -> bytes:
+    """
+    Compute the SHA-256 digest of a buffer.
+
+    This uses :mod:`hashlib`, whose OpenSSL backend uses the CPU's SHA
+    extensions when available and releases the GIL while hashing large
+    buffers.  All buffer and index hashes go through this function.
+    """
     if not isinstance(buf, memoryview):
         buf = memoryview(buf)
 
     return hashlib.sha256(buf).digest()
+
+
+def write_hashed(out: BinaryIO, buf: Buffer) -> bytes:
+    """
+    Write a buffer to a file and return its SHA-256 digest (as computed by
+    :func:`hash_buffer`).  The buffer is hashed and written in chunks, so each
+    chunk is only read from main memory once.
+    """
+    mv = memoryview(buf).cast("B")
+    if mv.nbytes <= WRITE_CHUNK_SIZE:
+        out.write(mv)
+        return hash_buffer(mv)
+
+    h = hashlib.sha256()
+    for start in range(0, mv.nbytes, WRITE_CHUNK_SIZE):
+        chunk = mv[start : start + WRITE_CHUNK_SIZE]
+        h.update(chunk)
+        out.write(chunk)
+    return h.digest()
+
+
+def pool_size(nbytes: int, nitems: int, max_workers: Optional[int] = None) -> int:
+    """
+    Get the number of worker threads to use for processing ``nitems`` buffers
+    totaling ``nbytes`` bytes.  A result of 1 means the work should be done
+    serially.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    return max(min(workers, nbytes // PARALLEL_MIN_BYTES, nitems), 1)
+
+
+def split_runs(items: Sequence[T], sizes: Sequence[int], nruns: int) -> list[Sequence[T]]:
+    """
+    Split a sequence into at most ``nruns`` contiguous runs of roughly equal
+    total size, so a thread pool can process each run as a single task.
+    """
+    total = sum(sizes)
+    runs: list[Sequence[T]] = []
+    start = 0
+    acc = 0
+    for i, size in enumerate(sizes[:-1]):
+        acc += size
+        if len(runs) + 1 < nruns and acc * nruns >= total * (len(runs) + 1):
+            runs.append(items[start : i + 1])
+            start = i + 1
+    runs.append(items[start:])
+    return runs
@@ -10,7 +10,8 @@ Support for encoding and decoding.
 
 from __future__ import annotations
 
-from typing import Callable, Optional, TypeAlias, overload
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypeAlias, overload
 
 from numcodecs.abc import Codec
 from numcodecs.registry import get_codec
@@ -23,6 +24,24 @@ CodecArg: TypeAlias = Codec | str | CodecSpec | CodecFunc
 ResolvedCodec: TypeAlias = Codec | CodecFunc
 
 
+@lru_cache(maxsize=32)
+def _cached_codec(key: frozenset[tuple[str, Any]]) -> Codec:
+    return get_codec(dict(key))
+
+
+def _get_codec(spec: CodecSpec) -> Codec:
+    """
+    Get a codec from its specification, re-using instances for repeated
+    specifications (codecs hold no per-buffer state, so they can be shared).
+    """
+    try:
+        key = frozenset(spec.items())
+    except TypeError:
+        # some configuration value is unhashable (e.g. a list)
+        return get_codec(spec)
+    return _cached_codec(key)
+
+
 @overload
 def resolve_codec(codec: CodecSpec) -> Codec:
     ...
@@ -43,13 +62,13 @@ def resolve_codec(codec: CodecArg, buf: Optional[Buffer] = None) -> ResolvedCode
     Resolve a codec arg into an instantiated codec.
     """
 
-    if isinstance(codec, str):
-        return resolve_codec({"id": codec})
-    elif isinstance(codec, dict):
-        return get_codec(codec)
-    elif isinstance(codec, Codec):
+    if isinstance(codec, Codec):
         return codec
-    elif hasattr(codec, "__call__"):
+    elif isinstance(codec, str):
+        return _get_codec({"id": codec})
+    elif isinstance(codec, dict):
+        return _get_codec(codec)
+    elif callable(codec):
         if buf is None:
             return codec
         else:
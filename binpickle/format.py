@@ -11,10 +11,12 @@ Constants and functions defining the binpickle format.
 from __future__ import annotations
 
 import enum
+import functools
 import io
+import operator
 import struct
-from dataclasses import dataclass, field, fields
-from typing import Any, TypeAlias
+from dataclasses import dataclass, field
+from typing import Any, NoReturn, TypeAlias
 
 from binpickle.errors import FormatError
 
@@ -33,6 +35,14 @@ MAGIC = b"BPCK"
 VERSION = 2
 HEADER_FORMAT = struct.Struct("!4sHHq")
 TRAILER_FORMAT = struct.Struct("!QL32s32s")
+HEADER_SIZE = HEADER_FORMAT.size
+TRAILER_SIZE = TRAILER_FORMAT.size
+
+# bound methods, to skip attribute lookups on every header/trailer
+_pack_header = HEADER_FORMAT.pack
+_unpack_header = HEADER_FORMAT.unpack_from
+_pack_trailer = TRAILER_FORMAT.pack
+_unpack_trailer = TRAILER_FORMAT.unpack_from
 
 
 def pretty_codec(codec: CodecSpec | list[CodecSpec] | None) -> str:
@@ -55,6 +65,14 @@ def pretty_codec(codec: CodecSpec | list[CodecSpec] | None) -> str:
         raise TypeError("invalid codec")
 
 
+def _bad_header(magic: bytes, version: int) -> NoReturn:
+    "Report an invalid header magic or version."
+    if magic != MAGIC:
+        raise FormatError("invalid magic {}".format(magic))
+    else:
+        raise FormatError("invalid version {}".format(version))
+
+
 class Flags(enum.Flag):
     """
     Flags that can be set in the BinPickle header.
@@ -75,7 +93,11 @@ class Flags(enum.Flag):
     """
 
 
-@dataclass
+# mask of all supported flags, for checking headers without the enum machinery
+_FLAG_MASK = functools.reduce(operator.or_, (f.value for f in Flags), 0)
+
+
+@dataclass(slots=True)
 class FileHeader:
     """
     File header for a BinPickle file.  The header is a 16-byte sequence containing the
@@ -87,7 +109,7 @@ class FileHeader:
        this field is set to -1.
     """
 
-    SIZE = HEADER_FORMAT.size
+    SIZE = HEADER_SIZE
 
     version: int = VERSION
     "The NumPy file version."
@@ -97,7 +119,7 @@ class FileHeader:
 
     def encode(self):
         "Encode the file header as bytes."
-        return HEADER_FORMAT.pack(MAGIC, self.version, self.flags._value_, self.length)
+        return _pack_header(MAGIC, self.version, self.flags._value_, self.length)
 
     @classmethod
     def decode(cls, buf: bytes | bytearray | memoryview, *, verify: bool = True) -> FileHeader:
@@ -111,36 +133,32 @@ class FileHeader:
                 Whether to fail on invalid header data (such as mismatched magic
                 or unsupported version).
         """
-        if len(buf) != HEADER_FORMAT.size:
+        if len(buf) != HEADER_SIZE:
             raise FormatError("incorrect header length")
 
-        m, v, flags, off = HEADER_FORMAT.unpack(buf)
-        if verify and m != MAGIC:
-            raise FormatError("invalid magic {}".format(m))
-        if verify and v != VERSION:
-            raise FormatError("invalid version {}".format(v))
-        try:
-            flags = Flags(flags)
-        except ValueError as e:
-            raise FormatError("unsupported flags", e)
-        return cls(v, flags, off)
+        m, v, flags, off = _unpack_header(buf)
+        if verify and (m, v) != (MAGIC, VERSION):
+            _bad_header(m, v)
+        if flags & ~_FLAG_MASK:
+            raise FormatError(f"unsupported flags {flags:#06x}")
+        return cls(v, Flags(flags), off)
 
     @classmethod
     def read(cls, file: io.FileIO | io.BufferedReader, **kwargs: bool) -> FileHeader:
-        buf = file.read(HEADER_FORMAT.size)
+        buf = file.read(HEADER_SIZE)
         return cls.decode(buf, **kwargs)
 
     def trailer_pos(self):
         "Get the position of the start of the file trailer."
-        if self.length >= HEADER_FORMAT.size + TRAILER_FORMAT.size:
-            return self.length - TRAILER_FORMAT.size
+        if self.length >= HEADER_SIZE + TRAILER_SIZE:
+            return self.length - TRAILER_SIZE
         elif self.length > 0:
             raise FormatError("file size {} not enough for BinPickle".format(self.length))
         else:
             return None  # We do not know the file size
 
 
-@dataclass
+@dataclass(slots=True)
 class FileTrailer:
     """
     File trailer for a BinPickle file.  The trailer is a 44-byte sequence that tells the
@@ -154,7 +172,7 @@ class FileTrailer:
        future support of MAC authentication of binpickle files.
     """
 
-    SIZE = TRAILER_FORMAT.size
+    SIZE = TRAILER_SIZE
 
     offset: int
     "Position of the start of the file index."
@@ -167,24 +185,29 @@ class FileTrailer:
 
     def encode(self):
         "Encode the file trailer as bytes."
-        return TRAILER_FORMAT.pack(self.offset, self.length, self.hash, self.reserved)
+        return _pack_trailer(self.offset, self.length, self.hash, self.reserved)
 
     @classmethod
-    def decode(cls, buf: bytes | bytearray | memoryview, *, verify: bool = True) -> FileTrailer:
+    def decode(
+        cls, buf: bytes | bytearray | memoryview, *, verify: bool = True, offset: int = 0
+    ) -> FileTrailer:
         """
         Decode a file trailer from bytes.
 
         Args:
             buf: Buffer containing the trailer to decode.
             verify: Whether to verify invalid trailer data.
+            offset:
+                Position of the trailer in ``buf``, so the trailer can be decoded
+                from a larger buffer without slicing it.
         """
-        off, len, ck, mac = TRAILER_FORMAT.unpack(buf)
+        off, len, ck, mac = _unpack_trailer(buf, offset)
         if verify and mac != b"\0" * 32:
             raise FormatError("nonzero MACs not supported")
         return cls(off, len, ck, mac)
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexEntry:
     """
     Index entry for a buffer in the BinPickle index.
@@ -198,18 +221,39 @@ class IndexEntry:
     "The decoded length of the buffer in bytes."
     hash: bytes
     "The SHA-256 checksum of the encoded buffer data."
-    info: BufferTypeInfo | None
+    info: BufferTypeInfo | None = None
     "Type information for the buffer (if available)."
     codecs: list[CodecSpec] = field(default_factory=list)
     "The sequence of codecs used to encode the buffer."
 
     def to_repr(self):
         "Convert an index entry to its MsgPack-compatible representation"
-        return dict((f.name, getattr(self, f.name)) for f in fields(self))
+        return {
+            "offset": self.offset,
+            "enc_length": self.enc_length,
+            "dec_length": self.dec_length,
+            "hash": self.hash,
+            "info": self.info,
+            "codecs": self.codecs,
+        }
 
     @classmethod
     def from_repr(cls, repr: dict[str, Any]):
-        "Convert an index entry from its MsgPack-compatible representation"
+        """
+        Convert an index entry from its MsgPack-compatible representation.
+        Optional fields take their defaults if missing, and unknown keys are
+        ignored.
+        """
         if not isinstance(repr, dict):
             raise TypeError("IndexEntry representation must be a dict")
-        return cls(**repr)
+        try:
+            return cls(
+                repr["offset"],
+                repr["enc_length"],
+                repr["dec_length"],
+                repr["hash"],
+                repr.get("info"),
+                list(repr.get("codecs", ())),
+            )
+        except KeyError as e:
+            raise FormatError(f"index entry missing field {e}")
@@ -4,17 +4,17 @@
 # Licensed under the MIT license, see LICENSE.md for details.
 # SPDX-License-Identifier: MIT
 
-import hashlib
 import io
 import logging
 import mmap
 import pickle
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from os import PathLike
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
 import msgpack
 from typing_extensions import Buffer
@@ -22,7 +22,7 @@ from typing_extensions import Buffer
 from binpickle.encode import resolve_codec
 from binpickle.errors import BinPickleError, FormatError, FormatWarning, IntegrityError
 
-from ._util import hash_buffer
+from ._util import buffer_size, hash_buffer, pool_size, split_runs
 from .format import FileHeader, FileTrailer, Flags, IndexEntry
 
 _log = logging.getLogger(__name__)
@@ -97,14 +97,40 @@ class BinPickleFile:
         """
         if not self.entries:
             raise ValueError("empty pickle file has no objects")
+        if not self.direct:
+            # we copy each buffer out once, in order
+            self._advise("MADV_SEQUENTIAL")
+
+        buffers = self.entries[:-1]
+        verify = self.verify
+        if verify and pool_size(sum(e.enc_length for e in buffers), len(buffers)) > 1:
+            # check all the buffers up front, in parallel
+            for i, (e, h) in enumerate(zip(buffers, self._entry_hashes(buffers))):
+                if h != e.hash:
+                    raise IntegrityError(f"buffer {i} has incorrect hash, corrupt file?")
+            verify = False
+
+        bufs: Iterable[Buffer]
+        sizes = [e.dec_length for e in buffers]
+        nworkers = pool_size(sum(sizes), len(buffers))
+        if nworkers > 1 and any(e.codecs for e in buffers):
+            # decode runs of buffers in parallel (the codecs release the GIL)
+            def read_run(run: Sequence[IndexEntry]) -> list[Buffer]:
+                return [self._read_buffer(e, verify=verify) for e in run]
+
+            with ThreadPoolExecutor(nworkers) as pool:
+                runs = split_runs(buffers, sizes, nworkers)
+                bufs = [b for run in pool.map(read_run, runs) for b in run]
+        else:
+            bufs = self._iter_buffers(buffers, verify=verify)
+
         p_bytes = self._read_buffer(self.entries[-1], direct=True)
         _log.debug(
-            "unpickling %d bytes and %d buffers", memoryview(p_bytes).nbytes, len(self.entries) - 1
+            "unpickling %d bytes and %d buffers", buffer_size(p_bytes), len(self.entries) - 1
         )
 
-        buf_gen = (self._read_buffer(e) for e in self.entries[:-1])
-        up = pickle.Unpickler(io.BytesIO(p_bytes), buffers=buf_gen)
-        return up.load()
+        # unpickle straight from the buffer; wrapping it in BytesIO would copy it
+        return pickle.loads(p_bytes, buffers=bufs)
 
     @property
     def is_mappable(self) -> bool:
@@ -123,21 +149,29 @@ class BinPickleFile:
         errors: list[str] = []
         assert self._index_buf is not None, "file not loaded"
 
-        i_sum = hashlib.sha256(self._index_buf).digest()
+        i_sum = hash_buffer(self._index_buf)
         if i_sum != self.trailer.hash:
             errors.append("index hash mismatch")
 
-        position = 16
-        for i, e in enumerate(self.entries):
+        # we read every byte once, so let the kernel read ahead aggressively
+        self._advise("MADV_SEQUENTIAL")
+        self._advise("MADV_WILLNEED")
+
+        position = FileHeader.SIZE
+        hashes = self._entry_hashes(self.entries)
+        for i, (e, cks) in enumerate(zip(self.entries, hashes)):
             if e.offset < position:
                 errors.append(f"entry {i}: offset {e.offset} before expected start {position}")
-            buf = self._read_buffer(e, direct=True)
-            ndec = memoryview(buf).nbytes
+            position = max(position, e.offset + e.enc_length)
+            if cks != e.hash:
+                # don't try to decode corrupt data
+                errors.append(f"entry {i}: invalid digest")
+                continue
+            # already hashed above
+            buf = self._read_buffer(e, direct=True, verify=False)
+            ndec = buffer_size(buf)
             if ndec != e.dec_length:
                 errors.append(f"entry {i}: decoded to {ndec} bytes, expected {e.dec_length}")
-            cks = hashlib.sha256(self._read_buffer(e, direct=True, decode=False)).digest()
-            if cks != e.hash:
-                errors.append("entry {i}: invalid digest")
 
         return errors
 
@@ -152,6 +186,55 @@ class BinPickleFile:
             self._map.close()
             self._map = None
 
+    def _entry_hashes(
+        self, entries: list[IndexEntry], max_workers: Optional[int] = None
+    ) -> list[bytes]:
+        """
+        Compute the hashes of the encoded data for a list of entries.  Hashing
+        releases the GIL, so when there is enough data, contiguous runs of
+        entries are hashed in a thread pool.
+        """
+        assert self._mv is not None, "file not open"
+        mv = self._mv
+
+        def run_hashes(run: Sequence[IndexEntry]) -> list[bytes]:
+            hashes = []
+            for entry in run:
+                buf = mv[entry.offset : entry.offset + entry.enc_length]
+                try:
+                    hashes.append(hash_buffer(buf))
+                finally:
+                    buf.release()
+            return hashes
+
+        sizes = [e.enc_length for e in entries]
+        nworkers = pool_size(sum(sizes), len(entries), max_workers)
+        if nworkers < 2:
+            return run_hashes(entries)
+
+        runs = split_runs(entries, sizes, nworkers)
+        with ThreadPoolExecutor(nworkers) as pool:
+            return [h for hashes in pool.map(run_hashes, runs) for h in hashes]
+
+    def _advise(self, advice: str, start: int = 0, length: Optional[int] = None) -> None:
+        """
+        Advise the kernel how a region of the file will be accessed (see
+        :meth:`mmap.mmap.madvise`).  ``advice`` is the name of an ``MADV_*``
+        constant; this does nothing if the platform does not support it.
+        """
+        flag = getattr(mmap, advice, None)
+        if flag is None or self._map is None:
+            return
+
+        # madvise needs a page-aligned start
+        aligned = start - start % mmap.PAGESIZE
+        if length is None:
+            length = len(self._map) - aligned
+        else:
+            length += start - aligned
+        if length > 0:
+            self._map.madvise(flag, aligned, length)
+
     def _read_header(self, bpf: io.FileIO) -> None:
         self.header = FileHeader.read(bpf)
         if sys.byteorder == "big" and Flags.BIG_ENDIAN not in self.header.flags:
@@ -169,9 +252,8 @@ class BinPickleFile:
             raise FormatError("no file length, corrupt binpickle file?")
         assert self._mv is not None, "file not open"
 
-        buf = self._mv[tpos:]
-        assert len(buf) == FileTrailer.SIZE
-        self.trailer = FileTrailer.decode(buf)
+        assert len(self._mv) - tpos == FileTrailer.SIZE
+        self.trailer = FileTrailer.decode(self._mv, offset=tpos)
 
         i_start = self.trailer.offset
         i_end = i_start + self.trailer.length
@@ -183,11 +265,35 @@ class BinPickleFile:
             self._index_buf = None
             raise e
 
-        self.entries = [IndexEntry.from_repr(e) for e in msgpack.unpackb(self._index_buf)]  # type: ignore
+        # tuples are cheaper to build than lists, and match the buffer info type
+        index = msgpack.unpackb(self._index_buf, use_list=False)
+        self.entries = [IndexEntry.from_repr(e) for e in index]  # type: ignore
         _log.debug("read %d entries from file", len(self.entries))
 
+    def _iter_buffers(self, entries: list[IndexEntry], *, verify: bool) -> Iterator[Buffer]:
+        """
+        Read buffers in order, asking the kernel to prefetch each buffer's
+        successor while the current one is being unpickled.  Buffers smaller
+        than a page are not worth the system call.
+        """
+        if entries:
+            self._prefetch(entries[0])
+        for i, entry in enumerate(entries):
+            if i + 1 < len(entries):
+                self._prefetch(entries[i + 1])
+            yield self._read_buffer(entry, verify=verify)
+
+    def _prefetch(self, entry: IndexEntry) -> None:
+        if entry.enc_length >= mmap.PAGESIZE:
+            self._advise("MADV_WILLNEED", entry.offset, entry.enc_length)
+
     def _read_buffer(
-        self, entry: IndexEntry, *, direct: Optional[bool] = None, decode: bool = True
+        self,
+        entry: IndexEntry,
+        *,
+        direct: Optional[bool] = None,
+        decode: bool = True,
+        verify: bool = True,
     ) -> Buffer:
         assert self._mv is not None, "file not open"
         assert self._map is not None, "file not open"
@@ -199,7 +305,8 @@ class BinPickleFile:
 
         buf = self._mv[start:end]
         try:
-            self._verify_buffer(buf, entry.hash)
+            if verify:
+                self._verify_buffer(buf, entry.hash)
         except Exception as e:
             # make sure we release the buffer, even if it's captured by the stack trace
             buf.release()
@@ -210,7 +317,7 @@ class BinPickleFile:
         if decode and entry.codecs:
             codecs = [resolve_codec(c) for c in entry.codecs]
             out: Buffer = buf
-            for codec in codecs[::-1]:
+            for codec in reversed(codecs):
                 out = codec.decode(out)
             return out
 
@@ -221,10 +328,8 @@ class BinPickleFile:
             _log.debug("copying %d bytes from %d", length, start)
             return buf.tobytes()
 
-    def _verify_buffer(
-        self, buf: memoryview, hash: bytes, msg: str = "buffer", force: bool = False
-    ):
-        if self.verify or force:
+    def _verify_buffer(self, buf: memoryview, hash: bytes, msg: str = "buffer"):
+        if self.verify:
             _log.debug("verifying %s", msg)
             bhash = hash_buffer(buf)
             if bhash != hash:
@@ -252,7 +357,8 @@ def file_info(file: str | PathLike[str]) -> BPKInfo:
         file: the path to the file to test.
     """
     try:
-        with open(file, "rb") as f:
+        # unbuffered, since we only read the 16-byte header
+        with open(file, "rb", buffering=0) as f:
             info = FileHeader.read(f)
             return BPKInfo(FileStatus.BINPICKLE, info.length)
     except FileNotFoundError:
@@ -4,21 +4,24 @@
 # Licensed under the MIT license, see LICENSE.md for details.
 # SPDX-License-Identifier: MIT
 
-import hashlib
 import io
 import logging
 import mmap
+import os
 import pickle
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
-from typing import Any
+from typing import Any, Sequence
 
 import msgpack
 import numpy as np
+from numcodecs.abc import Codec
 from typing_extensions import Buffer, List, Optional, Self
 
-from ._util import human_size
+from . import _util
+from ._util import buffer_size, human_size, pool_size, split_runs, write_hashed
 from .encode import CodecArg, ResolvedCodec, resolve_codec
 from .format import CodecSpec, FileHeader, FileTrailer, Flags, IndexEntry
 
@@ -65,6 +68,9 @@ class BinPickler(pickle.Pickler):
             * A function that takes a buffer and returns any of the above (or
               ``None``, to skip the step for that buffer), allowing encoding
               to vary from buffer to buffer.
+
+            When codecs are in use, large buffers are encoded in parallel on
+            a pool of worker threads, so codec functions must be thread-safe.
     """
 
     _pickle_stream: io.BytesIO
@@ -74,6 +80,10 @@ class BinPickler(pickle.Pickler):
     entries: List[IndexEntry]
     header: FileHeader | None
     _file: io.BufferedWriter
+    _deferred: bool
+    _pending: list[pickle.PickleBuffer]
+    _pending_bytes: int
+    _batch_bytes: int
 
     def __init__(
         self,
@@ -87,10 +97,12 @@ class BinPickler(pickle.Pickler):
         self.align = align
         self._file = open(filename, "wb")
         self.entries = []
+        self._pending = []
+        self._pending_bytes = 0
 
         # set up the binpickler
         super().__init__(
-            self._pickle_stream, pickle.HIGHEST_PROTOCOL, buffer_callback=self._write_buffer
+            self._pickle_stream, pickle.HIGHEST_PROTOCOL, buffer_callback=self._add_buffer
         )
 
         if codecs is None:
@@ -98,6 +110,15 @@ class BinPickler(pickle.Pickler):
         else:
             # pre-resolve the codecs
             self.codecs = [resolve_codec(c) for c in codecs]
+        # only codec functions need to be resolved for each buffer
+        self._deferred = any(not isinstance(c, Codec) for c in self.codecs)
+
+        # queue up to this much data to encode in parallel (0 to write serially)
+        nworkers = os.cpu_count() or 1
+        if self.codecs and nworkers > 1:
+            self._batch_bytes = 2 * nworkers * _util.PARALLEL_MIN_BYTES
+        else:
+            self._batch_bytes = 0
 
         self._init_header()
 
@@ -114,6 +135,7 @@ class BinPickler(pickle.Pickler):
     def dump(self, obj: object) -> None:
         "Dump an object to the file. Can only be called once."
         super().dump(obj)
+        self._flush_buffers()
         buf = self._pickle_stream.getbuffer()
 
         tot_enc = sum(e.enc_length for e in self.entries)
@@ -156,12 +178,18 @@ class BinPickler(pickle.Pickler):
         self,
         buf: Buffer,
     ) -> tuple[Buffer, list[CodecSpec]]:
-        # fast-path empty buffers
-        if memoryview(buf).nbytes == 0:
+        # fast-path unencoded and empty buffers
+        if not self.codecs:
+            return buf, []
+        if buffer_size(buf) == 0:
             return b"", []
 
         # resolve any deferred codecs
-        codecs = [resolve_codec(c, buf) for c in self.codecs]
+        codecs: list[Codec | None]
+        if self._deferred:
+            codecs = [resolve_codec(c, buf) for c in self.codecs]
+        else:
+            codecs = self.codecs  # type: ignore
 
         for codec in codecs:
             if codec is not None:
@@ -169,16 +197,60 @@ class BinPickler(pickle.Pickler):
 
         return buf, [c.get_config() for c in codecs if c is not None]
 
-    def _write_buffer(self, buf: Buffer) -> None:
+    def _add_buffer(self, buf: pickle.PickleBuffer) -> None:
+        """
+        Pickler buffer callback.  Small buffers are written immediately; when
+        buffers can be encoded in parallel, large ones (and any after them, to
+        keep the buffers in order) are queued and written in batches.
+        """
+        size = buffer_size(buf)
+        if not self._batch_bytes or (not self._pending and size < _util.PARALLEL_MIN_BYTES // 16):
+            self._write_buffer(buf)
+            return
+
+        self._pending.append(buf)
+        self._pending_bytes += size
+        if self._pending_bytes >= self._batch_bytes:
+            self._flush_buffers()
+
+    def _flush_buffers(self) -> None:
+        """
+        Write the queued buffers.  If there is enough data, contiguous runs of
+        buffers are encoded on a thread pool (zlib, blosc, etc. release the
+        GIL), and the calling thread hashes and writes them in order, so the
+        file layout is the same as writing them serially.
+        """
+        bufs = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+
+        sizes = [buffer_size(b) for b in bufs]
+        nworkers = pool_size(sum(sizes), len(bufs))
+        if nworkers < 2:
+            for buf in bufs:
+                self._write_buffer(buf)
+            return
+
+        def encode_run(run: Sequence[pickle.PickleBuffer]):
+            return [self._encode_buffer(b) for b in run]
+
+        with ThreadPoolExecutor(nworkers) as pool:
+            runs = split_runs(bufs, sizes, nworkers)
+            for run, encoded in zip(runs, pool.map(encode_run, runs)):
+                for buf, enc in zip(run, encoded):
+                    self._write_buffer(buf, enc)
+
+    def _write_buffer(
+        self, buf: Buffer, encoded: Optional[tuple[Buffer, list[CodecSpec]]] = None
+    ) -> None:
         mv = buf.raw() if isinstance(buf, pickle.PickleBuffer) else memoryview(buf)
         offset = self._file.tell()
 
         if self.align:
             off2 = _align_pos(offset)
             if off2 > offset:
-                nzeds = off2 - offset
-                zeds = b"\x00" * nzeds
-                self._file.write(zeds)
+                # seek past the padding; the next write fills the gap with zeros
+                self._file.seek(off2)
                 assert self._file.tell() == off2
                 offset = off2
 
@@ -189,8 +261,10 @@ class BinPickler(pickle.Pickler):
             binfo = ("ndarray", str(mv.obj.dtype), mv.obj.shape)  # type: ignore
 
         _log.debug("writing %d bytes at position %d", length, offset)
-        buf, c_spec = self._encode_buffer(buf)
-        enc_len = memoryview(buf).nbytes
+        if encoded is None:
+            encoded = self._encode_buffer(buf)
+        buf, c_spec = encoded
+        enc_len = buffer_size(buf)
         _log.debug(
             "encoded %d bytes to %d (%.2f%% saved)",
             length,
@@ -198,24 +272,25 @@ class BinPickler(pickle.Pickler):
             (length - enc_len) / length * 100 if length else -0.0,
         )
         _log.debug("used codecs %s", c_spec)
-        hash = hashlib.sha256(buf)
-        _log.debug("has hash %s", hash.hexdigest())
-        self._file.write(buf)
+        hash = write_hashed(self._file, buf)
+        _log.debug("has hash %s", hash.hex())
 
         assert self._file.tell() == offset + enc_len
 
-        self.entries.append(IndexEntry(offset, enc_len, length, hash.digest(), binfo, c_spec))
+        self.entries.append(IndexEntry(offset, enc_len, length, hash, binfo, c_spec))
 
     def _write_index(self) -> FileTrailer:
-        buf = msgpack.packb([e.to_repr() for e in self.entries])
+        # pack entries one at a time, instead of building a list of all their reprs
+        packer = msgpack.Packer()
+        buf = bytearray(packer.pack_array_header(len(self.entries)))
+        for e in self.entries:
+            buf += packer.pack(e.to_repr())
         pos = self._file.tell()
         nbs = len(buf)
         _log.debug(
             "writing %d index entries (%d bytes) at position %d", len(self.entries), nbs, pos
         )
-        self._file.write(buf)
-        hash = hashlib.sha256(buf)
-        ft = FileTrailer(pos, nbs, hash.digest())
+        ft = FileTrailer(pos, nbs, write_hashed(self._file, buf))
         self._file.write(ft.encode())
         return ft
 
@@ -6,7 +6,7 @@ from typing import Generator
 import numpy as np
 import pandas as pd
 
-from pytest import CaptureFixture, LineMatcher, fixture
+from pytest import CaptureFixture, LineMatcher, fixture, mark, raises
 
 from binpickle._cli import main
 from binpickle.write import dump
@@ -57,11 +57,37 @@ def test_disassemble(capsys: CaptureFixture[str], df_bpf: Path):
     lm.re_match_lines([r"\s+\d+:\s+\\x\w+\s+PROTO\s+5"])
 
 
+def test_disassemble_mappable(
+    capsys: CaptureFixture[str], tmp_path: Path, rng: np.random.Generator
+):
+    file = tmp_path / "data.bpk"
+    gen_frame(file, rng, mappable=True)
+
+    capsys.readouterr()
+    rc = main(["-D", fspath(file)], init_log=False)
+    assert rc == 0
+    out, _err = capsys.readouterr()
+    lm = LineMatcher(out.splitlines())
+    lm.re_match_lines([r"\s+\d+:\s+\\x\w+\s+PROTO\s+5"])
+
+
 def test_verify(capsys: CaptureFixture[str], df_bpf: Path):
     rc = main(["-V", fspath(df_bpf)], init_log=False)
     assert rc == 0
 
 
+def test_verify_jobs(capsys: CaptureFixture[str], df_bpf: Path):
+    rc = main(["-V", "-j", "2", fspath(df_bpf)], init_log=False)
+    assert rc == 0
+
+
+@mark.parametrize("jobs", ["0", "-1"])
+def test_verify_bad_jobs(capsys: CaptureFixture[str], df_bpf: Path, jobs: str):
+    with raises(SystemExit):
+        main(["-V", "-j", jobs, fspath(df_bpf)], init_log=False)
+    assert "must be at least 1" in capsys.readouterr().err
+
+
 def test_verify_fail(capsys: CaptureFixture[str], df_bpf: Path):
     # corrupt the file
     with open(df_bpf, "r+b") as f:
@@ -0,0 +1,48 @@
+# This file is part of BinPickle.
+# Copyright (C) 2020-2023 Boise State University
+# Copyright (C) 2023-2024 Drexel University
+# Licensed under the MIT license, see LICENSE.md for details.
+# SPDX-License-Identifier: MIT
+
+import numcodecs as nc
+
+from pytest import raises
+
+from binpickle.encode import resolve_codec
+
+
+def test_resolve_name():
+    codec = resolve_codec("gzip")
+    assert isinstance(codec, nc.GZip)
+
+
+def test_resolve_spec_reused():
+    c1 = resolve_codec({"id": "gzip", "level": 5})
+    c2 = resolve_codec({"level": 5, "id": "gzip"})
+    assert isinstance(c1, nc.GZip)
+    assert c1 is c2
+
+    c3 = resolve_codec({"id": "gzip", "level": 3})
+    assert c3 is not c1
+    assert c3.get_config()["level"] == 3
+
+
+def test_resolve_unhashable_spec():
+    spec = {"id": "categorize", "labels": ["a", "b"], "dtype": "<U1"}
+    codec = resolve_codec(spec)
+    assert isinstance(codec, nc.Categorize)
+    assert codec.labels == ["a", "b"]
+
+
+def test_resolve_func():
+    def pick(buf):
+        return "gzip" if len(buf) > 4 else None
+
+    assert resolve_codec(pick) is pick
+    assert isinstance(resolve_codec(pick, b"0123456789"), nc.GZip)
+    assert resolve_codec(pick, b"0") is None
+
+
+def test_resolve_invalid():
+    with raises(TypeError):
+        resolve_codec(42)  # type: ignore
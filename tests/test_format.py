@@ -7,13 +7,24 @@
 from pytest import raises
 
 from binpickle.errors import FormatError
-from binpickle.format import HEADER_FORMAT, TRAILER_FORMAT, FileHeader, FileTrailer, Flags
+from binpickle.format import (
+    HEADER_FORMAT,
+    HEADER_SIZE,
+    TRAILER_FORMAT,
+    TRAILER_SIZE,
+    FileHeader,
+    FileTrailer,
+    Flags,
+    IndexEntry,
+)
 
 
 def test_format_sizes():
     assert HEADER_FORMAT.size == 16
+    assert HEADER_SIZE == 16
     assert FileHeader.SIZE == 16
     assert TRAILER_FORMAT.size == 76
+    assert TRAILER_SIZE == 76
     assert FileTrailer.SIZE == 76
 
 
@@ -70,3 +81,40 @@ def test_catch_bad_flags():
     with raises(FormatError) as exc:
         FileHeader.decode(b"BPCK\x00\x02\x00\xff" + (b"\x00" * 8))
     assert "unsupported flags" in str(exc.value)
+
+
+def test_trailer_round_trip():
+    t = FileTrailer(1024, 57, b"\x01" * 32)
+    bs = t.encode()
+    assert len(bs) == 76
+
+    t2 = FileTrailer.decode(bs)
+    assert t2 == t
+
+    t3 = FileTrailer.decode(memoryview(b"\0" * 20 + bs), offset=20)
+    assert t3 == t
+
+
+def test_index_entry_round_trip():
+    e = IndexEntry(16, 100, 200, b"\x01" * 32, ("ndarray", "int32", (50,)), [{"id": "gzip"}])
+    e2 = IndexEntry.from_repr(e.to_repr())
+    assert e2 == e
+
+
+def test_index_entry_defaults():
+    e = IndexEntry.from_repr({"offset": 16, "enc_length": 8, "dec_length": 8, "hash": b"\0" * 32})
+    assert e.info is None
+    assert e.codecs == []
+    assert e == IndexEntry(16, 8, 8, b"\0" * 32)
+
+
+def test_index_entry_unknown_field():
+    e = IndexEntry(16, 8, 8, b"\0" * 32)
+    e2 = IndexEntry.from_repr(dict(e.to_repr(), extra=1))
+    assert e2 == e
+
+
+def test_index_entry_missing_field():
+    with raises(FormatError) as exc:
+        IndexEntry.from_repr({"offset": 16, "enc_length": 8})
+    assert "dec_length" in str(exc.value)
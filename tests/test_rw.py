@@ -6,6 +6,7 @@
 
 import gc
 import itertools as it
+import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -20,6 +21,7 @@ import pytest
 from hypothesis import assume, given, settings
 from hypothesis.extra.numpy import arrays, scalar_dtypes
 
+from binpickle import _util
 from binpickle.errors import FormatWarning
 from binpickle.format import Flags
 from binpickle.read import BinPickleFile, load
@@ -267,3 +269,38 @@ def test_map_many_arrays(a):
             assert len(a2) == len(a)
             assert all(a2 == a)
             del a2
+
+
+def test_advise(tmp_path: Path, rng: np.random.Generator):
+    "Access advice should accept unaligned regions and unknown advice"
+    file = tmp_path / "data.bpk"
+    dump(rng.uniform(size=10_000), file, mappable=True)
+
+    with BinPickleFile(file) as bpf:
+        e = bpf.entries[-1]
+        bpf._advise("MADV_WILLNEED", e.offset, e.enc_length)
+        bpf._advise("MADV_SEQUENTIAL")
+        bpf._advise("MADV_NO_SUCH_ADVICE")
+
+
+def test_compress_parallel(tmp_path: Path, rng: np.random.Generator, monkeypatch):
+    "Buffers coded in parallel should still be written and read in order"
+    # make small files use the thread pool
+    monkeypatch.setattr(_util, "PARALLEL_MIN_BYTES", 64 * 1024)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    file = tmp_path / "data.bpk"
+    data = [rng.integers(0, 100, size=rng.integers(100, 50_000)) for _ in range(40)]
+    dump(data, file)
+
+    with BinPickleFile(file) as bpf:
+        assert not bpf.find_errors()
+        assert len(bpf.entries) == 41
+        for a, e in zip(data, bpf.entries):
+            assert e.dec_length == a.nbytes
+            assert e.codecs
+        offsets = [e.offset for e in bpf.entries]
+        assert offsets == sorted(offsets)
+        data2 = bpf.load()
+        assert len(data2) == len(data)
+        for a, a2 in zip(data, data2):
+            assert np.all(a2 == a)
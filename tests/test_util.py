@@ -4,11 +4,19 @@
 # Licensed under the MIT license, see LICENSE.md for details.
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import io
 import logging
+import os
+import pickle
+
+import numpy as np
 
-from hypothesis import given
 import hypothesis.strategies as st
+import pytest
+from hypothesis import given
 
+from binpickle import _util
 from binpickle.write import _align_pos
 
 _log = logging.getLogger(__name__)
@@ -19,3 +27,61 @@ def test_align(n):
     res = _align_pos(n, 1024)
     assert res >= n
     assert res % 1024 == 0
+
+
+@pytest.mark.parametrize(
+    ["n", "expected"],
+    [
+        (0, "0.00 MiB"),
+        (1 << 20, "1.00 MiB"),
+        (1_500_000, "1.43 MiB"),
+        (5 << 30, "5120.00 MiB"),
+        # exact halves round to even, as with "%.2f"
+        (131072, "0.12 MiB"),
+        (655360, "0.62 MiB"),
+        (393216, "0.38 MiB"),
+    ],
+)
+def test_human_size_fallback(n, expected, monkeypatch):
+    monkeypatch.setattr(_util, "naturalsize", None)
+    assert _util.human_size(n) == expected
+
+
+def test_buffer_size():
+    assert _util.buffer_size(b"hello") == 5
+    assert _util.buffer_size(bytearray(10)) == 10
+    assert _util.buffer_size(memoryview(b"hello")) == 5
+    assert _util.buffer_size(np.zeros(10, dtype="i4")) == 40
+    assert _util.buffer_size(memoryview(np.zeros(10, dtype="i4"))) == 40
+    assert _util.buffer_size(pickle.PickleBuffer(np.zeros((3, 4), dtype="f8"))) == 96
+
+
+@pytest.mark.parametrize("size", [0, 1000, _util.WRITE_CHUNK_SIZE * 2 + 17])
+def test_write_hashed(size, rng: np.random.Generator):
+    data = rng.integers(0, 256, size, dtype="u1")
+    out = io.BytesIO()
+    hash = _util.write_hashed(out, data)
+    assert out.getvalue() == data.tobytes()
+    assert hash == hashlib.sha256(data).digest()
+
+
+def test_pool_size(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    mib = _util.PARALLEL_MIN_BYTES
+    assert _util.pool_size(1000, 5000) == 1
+    assert _util.pool_size(2 * mib, 5000) == 2
+    assert _util.pool_size(100 * mib, 5000) == 4
+    assert _util.pool_size(100 * mib, 3) == 3
+    assert _util.pool_size(100 * mib, 5000, 8) == 8
+
+
+@pytest.mark.parametrize(
+    "sizes,nruns",
+    [([1] * 10, 3), ([100, 1, 1, 1, 1], 3), ([5], 4), ([0] * 4, 3), ([3, 7, 2, 9, 4, 1], 2)],
+)
+def test_split_runs(sizes, nruns):
+    items = list(range(len(sizes)))
+    runs = _util.split_runs(items, sizes, nruns)
+    assert 1 <= len(runs) <= nruns
+    assert all(runs)
+    assert [i for r in runs for i in r] == items
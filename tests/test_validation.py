@@ -12,7 +12,7 @@ import pandas as pd
 
 import pytest
 
-from binpickle import BinPickleFile, dump
+from binpickle import BinPickleFile, _util, dump
 from binpickle.errors import FormatError, IntegrityError
 
 _log = logging.getLogger(__name__)
@@ -97,3 +97,86 @@ def test_verfy_buffer(tmp_path, rng: np.random.Generator):
     with BinPickleFile(file) as bpf:
         with pytest.raises(IntegrityError, match=r"incorrect hash"):
             bpf.load()
+
+
+def test_verify_many_buffers(tmp_path, rng: np.random.Generator, monkeypatch):
+    "Corrupt buffer should fail hash when buffers are verified in parallel."
+    # make even small files use the thread pool
+    monkeypatch.setattr(_util, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    file = tmp_path / "data.bpk"
+
+    arrays = [rng.integers(0, 1000, 500) for _ in range(8)]
+    dump(arrays, file, mappable=True)
+
+    with BinPickleFile(file) as bpf:
+        e = bpf.entries[3]
+        offset = e.offset
+
+    with open(file, "r+b") as f:
+        f.seek(offset + 8)
+        f.write(b"XXXXXXXX")
+
+    with BinPickleFile(file) as bpf:
+        errors = bpf.find_errors()
+        assert errors == ["entry 3: invalid digest"]
+        with pytest.raises(IntegrityError, match=r"incorrect hash"):
+            bpf.load()
+
+
+def test_find_errors_compressed(tmp_path, rng: np.random.Generator):
+    "Corrupt compressed buffer should be reported, not decoded."
+    file = tmp_path / "data.bpk"
+
+    arrays = [rng.integers(0, 1000, 500) for _ in range(3)]
+    dump(arrays, file)
+
+    with BinPickleFile(file) as bpf:
+        assert not bpf.find_errors()
+        offset = bpf.entries[1].offset
+
+    with open(file, "r+b") as f:
+        f.seek(offset + 4)
+        f.write(b"XXXXXXXXXXXX")
+
+    with BinPickleFile(file) as bpf:
+        errors = bpf.find_errors()
+        assert errors == ["entry 1: invalid digest"]
+
+
+def test_find_overlap(tmp_path, rng: np.random.Generator):
+    "Overlapping buffers should be reported."
+    file = tmp_path / "data.bpk"
+
+    arrays = [rng.integers(0, 1000, 500) for _ in range(3)]
+    dump(arrays, file, mappable=True)
+
+    with BinPickleFile(file) as bpf:
+        assert not bpf.find_errors()
+        # point entry 2 back into the middle of entry 1
+        e1 = bpf.entries[1]
+        bpf.entries[2].offset = e1.offset + 8
+        errors = bpf.find_errors()
+        assert errors[0].startswith("entry 2: offset")
+
+
+def test_verify_compressed_buffers(tmp_path, rng: np.random.Generator, monkeypatch):
+    "Corrupt buffer should fail hash when compressed buffers are loaded in parallel."
+    # make even small files use the thread pool
+    monkeypatch.setattr(_util, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    file = tmp_path / "data.bpk"
+
+    arrays = [rng.integers(0, 1000, 500) for _ in range(3)]
+    dump(arrays, file)
+
+    with BinPickleFile(file) as bpf:
+        offset = bpf.entries[1].offset
+
+    with open(file, "r+b") as f:
+        f.seek(offset + 8)
+        f.write(b"XXXXXXXX")
+
+    with BinPickleFile(file) as bpf:
+        with pytest.raises(IntegrityError, match=r"incorrect hash"):
+            bpf.load()